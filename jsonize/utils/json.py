@@ -35,17 +35,30 @@ Details on EUROCONTROL: http://www.eurocontrol.int
 
 from __future__ import annotations
 
+import re
 from enum import Enum
-from typing import Dict, Any, Union, List
+from functools import lru_cache
+from typing import Dict, Any, Union, List, Tuple, Optional
 import logging
 
-from pyparsing import nums, Word, Optional, Literal, Group, ParseResults
-
 __author__ = "EUROCONTROL (SWIM)"
 
 
 logger = logging.getLogger(__name__)
 
+# A single bracket notation slice or index, e.g. '[0]', '[:3]', '[1:5:2]'. The second group
+# captures the colon so that an index '[1]' can be told apart from a slice '[1:]'.
+_SLICE_RE = re.compile(r'\[(-?\d+)?(:(-?\d+)?(?::(-?\d+)?)?)?\]')
+
+# String representations of JSON basetypes, used to infer the type of XML values. They follow the
+# syntax accepted by int() and float(), including underscores between digits, and are matched
+# against stripped values. Note that 'nan' and 'inf' are not valid JSON numbers.
+_DIGITS = r'\d+(?:_\d+)*'
+_INT_RE = re.compile(rf'[+-]?{_DIGITS}\Z')
+_FLOAT_RE = re.compile(rf'[+-]?({_DIGITS}\.(?:{_DIGITS})?|\.{_DIGITS}|{_DIGITS})'
+                       rf'([eE][+-]?{_DIGITS})?\Z')
+_BOOL_STRINGS = frozenset(('true', 'false'))
+
 
 class JSONPath():
     """
@@ -59,56 +72,80 @@ class JSONPath():
     :param json_path: String representation of a JSONPath
     """
 
+    __slots__ = ('_raw_json_path', '_structure', '_plain_keys', '_is_plain', '_is_absolute',
+                 '_is_relative', '_hash')
+
     def __init__(self, json_path: str) -> None:
-        self.raw_json_path = json_path
-        self.json_path_structure = JSONPath._json_path_structure(json_path)
+        self._raw_json_path = json_path  # type: Optional[str]
+        self._set_root(json_path[:1])
+        # Parsed lazily, many paths are only compared, printed or appended to as strings.
+        self._structure = None  # type: Optional[List[Union[str, int, slice]]]
+        self._plain_keys = None  # type: Optional[Tuple[Union[str, int, slice], ...]]
+        self._is_plain = False
+        self._hash = None  # type: Optional[int]
+
+    @property
+    def raw_json_path(self) -> str:
+        """
+        :return: The string representation of the JSONPath, see _LazyJSONPath for paths where it
+                 is only built on access.
+        """
+        if self._raw_json_path is None:
+            self._raw_json_path = JSONPath.string_representation(self.json_path_structure)
+        return self._raw_json_path
 
-    @classmethod
-    def from_json_path_structure(cls, json_path_structure: List[Union[str, slice]]) -> JSONPath:
-        return cls(cls.string_representation(json_path_structure))
+    @raw_json_path.setter
+    def raw_json_path(self, json_path: str) -> None:
+        self._raw_json_path = json_path
+        self._hash = None
 
-    @staticmethod
-    def _parse_slices(slice_substring: str) -> List[Union[int, slice]]:
+    @property
+    def json_path_structure(self) -> List[Union[str, int, slice]]:
         """
-        Parses a string expression consisting of a number of bracket notation python slices
-        (e.g. '[0], '[0:5:2]'...) and returns the list of index or slices to which it corresponds.
-
-        :param slice_substring: A string consisting of 0 or more consecutive slice expressions using
-                                bracket notation.
-        :return: A list of slices parsed from the slice_substring.
+        :return: A list where each entry corresponds to a JSON node of the path, see
+                 _json_path_structure.
         """
+        if self._structure is None:
+            self._structure = list(_json_path_structure_cached(self.raw_json_path))
+        return self._structure
 
-        slice_expression = Group(
-            ("[" + Optional((Optional('-') + Word(nums))).setResultsName('start') +
-                   Optional(Literal(':') + (Optional('-') + Word(nums)).setResultsName('stop') +
-                   Optional(Literal(':') + (Optional('-') + Word(nums)).setResultsName('step'))) +
-             "]"))
-
-        multislice_expression = slice_expression[...]
+    def _get_plain_keys(self) -> Optional[Tuple[Union[str, int, slice], ...]]:
+        """
+        :return: The keys of the JSONPath without its '$' and '@' symbols if all of them are
+                 dictionary keys, None if it contains any index or slice.
+        """
+        if self._plain_keys is None:
+            keys = tuple(key for key in self.json_path_structure if key != '$' and key != '@')
+            self._is_plain = all(type(key) is str for key in keys)
+            self._plain_keys = keys
+        return self._plain_keys if self._is_plain else None
 
-        slice_matches = multislice_expression.parseString(slice_substring)  # type: List[ParseResults]
-        slices = []
-        for match in slice_matches:
-            match_step = match.get('step')
-            step = int(''.join(match_step)) if match_step else None
+    @classmethod
+    def from_json_path_structure(cls, json_path_structure: List[Union[str, int, slice]]) -> JSONPath:
+        return cls._from_structure_fast(json_path_structure)
 
-            match_stop = match.get('stop')
-            stop = int(''.join(match_stop)) if match_stop else None
+    @classmethod
+    def _from_structure_fast(cls, json_path_structure: List[Union[str, int, slice]]) -> JSONPath:
+        """
+        Builds a JSONPath from an already parsed structure, installing it directly instead of
+        parsing the string representation back.
 
-            match_start = match.get('start')
-            if match_start:
-                start = int(''.join(match_start))
+        :param json_path_structure: List of string, integer or slice that defines the JSONPath.
+        :return: The JSONPath defined by the structure.
+        """
+        json_path = cls(cls.string_representation(json_path_structure))
+        json_path._structure = list(json_path_structure)
+        return json_path
 
-                if not (stop or step):
-                    # When only one parameter is given, we use index access instead of slice
-                    slices.append(start)
-                else:
-                    slices.append(slice(start, stop, step))
-            else:
-                start = None
-                slices.append(slice(start, stop, step))
+    def _set_root(self, root: str) -> None:
+        """
+        Caches whether the JSONPath is absolute or relative, as defined by its root symbol. It
+        cannot change afterwards, appending to a JSONPath keeps its root.
 
-        return slices
+        :param root: The first character of the JSONPath.
+        """
+        self._is_absolute = root == '$'
+        self._is_relative = root == '@'
 
     @staticmethod
     def _json_path_structure(json_path_string: str) -> List[Union[str, int, slice]]:
@@ -120,34 +157,42 @@ class JSONPath():
         :param json_path_string: JSONPath string representation.
         :return: A list
         """
-        json_path_elements = json_path_string.split('.')
-        json_path_structure = []
+        json_path_structure = []  # type: List[Union[str, int, slice]]
+        length = len(json_path_string)
+        position = 0
+
+        while True:
+            # Each element spans up to the next dot, it may end with a number of slices
+            element_end = json_path_string.find('.', position)
+            if element_end == -1:
+                element_end = length
+
+            slice_start = json_path_string.find('[', position, element_end)
+            if slice_start == -1:
+                json_path_structure.append(json_path_string[position:element_end])
+            else:
+                json_path_structure.append(json_path_string[position:slice_start])
+                _append_slices(json_path_structure, json_path_string, slice_start, element_end)
 
-        for element in json_path_elements:
-            try:
-                slice_start = element.index('[')
-                slice_substring = element[slice_start:]
-                json_path_structure.append(element[:slice_start])
-                json_path_structure += JSONPath._parse_slices(slice_substring)
-            except ValueError:
-                # If element.index() raises ValueError, no slice is defined in the element
-                json_path_structure.append(element)
+            if element_end == length:
+                break
+            position = element_end + 1
 
         return json_path_structure
 
-    def is_absolute(self):
+    def is_absolute(self) -> bool:
         """
         :return: Boolean indicating if the JSONPath is an absolute JSONPath.
         """
-        return self.raw_json_path[0] == '$'
+        return self._is_absolute
 
-    def is_relative(self):
+    def is_relative(self) -> bool:
         """
         :return: Boolean indicating if the JSONPath is relative.
         """
-        return self.raw_json_path[0] == '@'
+        return self._is_relative
 
-    def split(self, at: int) -> (JSONPath, JSONPath):
+    def split(self, at: int) -> Tuple[JSONPath, JSONPath]:
         """
         Produces an absolute and a relative JSONPath by splitting the current one at the given index
         location. The at parameter behaves like the stop in a Python slice. That is:
@@ -162,14 +207,25 @@ class JSONPath():
             raise IndexError
 
         if len(self.json_path_structure) == 1:
-            return JSONPath(self.json_path_structure[0]), JSONPath('@')
+            return JSONPath._from_structure_fast(self.json_path_structure), JSONPath('@')
 
-        return JSONPath.from_json_path_structure(self.json_path_structure[:at]), \
-               JSONPath.from_json_path_structure(['@'] + self.json_path_structure[at:])
+        return JSONPath._from_structure_fast(self.json_path_structure[:at]), \
+               JSONPath._from_structure_fast(['@'] + self.json_path_structure[at:])
+
+    def slice_structure(self, at: int) -> List[Union[str, int, slice]]:
+        """
+        Returns the structure of the JSONPath up to the given index location, without building a
+        new JSONPath. The at parameter behaves like the stop in a Python slice.
+
+        :param at: Index position where to slice the JSONPath structure.
+        :return: A list with the JSONPath structure up to the at location.
+        """
+        return self.json_path_structure[:at]
 
     def append(self, relative_path: JSONPath) -> None:
         """
-        Appends a relative JSONPath to the end.
+        Appends a relative JSONPath to the end. It changes the hash of the JSONPath, which must not
+        be appended to while it is a key of a dict or set.
 
         :param relative_path: Relative JSONPath to append.
         :return: Result of appending the relative JSONPath to the end.
@@ -177,40 +233,156 @@ class JSONPath():
         if not relative_path.is_relative():
             raise ValueError('Input "relative_path" is not a relative path.')
 
-        self.raw_json_path = self.raw_json_path + relative_path.raw_json_path[1:]
-        self.json_path_structure = self.json_path_structure + relative_path.json_path_structure[1:]
+        self.raw_json_path += relative_path.raw_json_path[1:]
+        # The structure is owned by this JSONPath, it can be extended in place
+        if self._structure is not None:
+            self._structure.extend(relative_path.json_path_structure[1:])
+        self._plain_keys = None
+        self._hash = None
 
     @staticmethod
-    def string_representation(json_path_structure: List[Union[str, int, slice]]):
+    def string_representation(json_path_structure: List[Union[str, int, slice]]) -> str:
         """
         Returns a string representation from a json_path_structure.
 
         :param json_path_structure: List of string, integer or slice that defines the JSONPath.
         """
-        json_path = json_path_structure.pop(0)
-        for element in json_path_structure:
-            if isinstance(element, slice):
-                start = element.start or ''
-                stop = element.stop or ''
-                step = element.step or ''
-
-                json_path += f'[' + bool(start) * f'{start}' + ':' + bool(stop) * f'{stop}' + bool(step) * f':{step}' + ']'
+        json_path = [str(json_path_structure[0])]
+        for element in json_path_structure[1:]:
+            if isinstance(element, str):
+                json_path.append('.' + element)
             elif isinstance(element, int):
-                json_path += f'[{element}]'
+                json_path.append(f'[{element}]')
             else:
-                json_path += '.' + element
+                json_path.append(_format_slice(element))
 
-        return json_path
+        return ''.join(json_path)
 
-    def __str__(self):
+    def __str__(self) -> str:
         return self.raw_json_path
 
-    def __repr__(self):
+    def __repr__(self) -> str:
         return self.raw_json_path
 
-    def __eq__(self, other: JSONPath):
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, JSONPath):
+            return NotImplemented
+        # Equal strings always parse to equal structures, which then don't need to be built
+        if self.raw_json_path == other.raw_json_path:
+            return True
         return self.json_path_structure == other.json_path_structure
 
+    def __hash__(self) -> int:
+        # Equality is defined on the structure, e.g. '$.a[1:2:]' == '$.a[1:2]', so the hash is
+        # computed on its canonical string representation rather than on raw_json_path. It is
+        # computed once, a JSONPath must not be appended to while it is a key of a dict or set.
+        if self._hash is None:
+            self._hash = hash(self.string_representation(self.json_path_structure))
+        return self._hash
+
+
+def _root_symbol(json_path_structure: List[Union[str, int, slice]]) -> str:
+    """
+    :param json_path_structure: List of string, integer or slice that defines the JSONPath.
+    :return: The first character of the JSONPath, '$' or '@' for absolute and relative paths.
+    """
+    root = json_path_structure[0] if json_path_structure else ''
+    return root[:1] if isinstance(root, str) else ''
+
+
+def _format_slice(json_path_slice: slice) -> str:
+    """
+    :param json_path_slice: A slice of a JSONPath structure.
+    :return: The bracket notation of the slice, e.g. '[1:5:2]' or '[:3]'.
+    """
+    start = '' if json_path_slice.start is None else json_path_slice.start
+    stop = '' if json_path_slice.stop is None else json_path_slice.stop
+    step = '' if json_path_slice.step is None else f':{json_path_slice.step}'
+    return f'[{start}:{stop}{step}]'
+
+
+def _append_slices(json_path_structure: List[Any], json_path_string: str,
+                   start: int, end: int) -> None:
+    """
+    Parses the consecutive bracket notation indices and slices found in json_path_string between
+    start and end, e.g. '[0][1:5:2]', and appends them to json_path_structure. Parsing stops at the
+    first character that doesn't start a valid bracket expression.
+
+    :param json_path_structure: List to which the parsed indices and slices are appended.
+    :param json_path_string: JSONPath string representation.
+    :param start: Position of the first bracket.
+    :param end: Position where the bracket expressions end.
+    """
+    position = start
+    while position < end and json_path_string[position] == '[':
+        bracket_end = json_path_string.find(']', position, end)
+        if bracket_end == -1:
+            return
+
+        # Plain indices, e.g. '[-1]', are by far the most common and don't need the slice regex
+        body = json_path_string[position + 1:bracket_end]
+        if body and ':' not in body:
+            digits = body[1:] if body[0] == '-' else body
+            if not digits.isdecimal():
+                return
+            json_path_structure.append(int(body))
+        else:
+            match = _SLICE_RE.match(json_path_string, position, bracket_end + 1)
+            if match is None:
+                return
+            json_path_structure.append(_slice_from_match(match))
+
+        position = bracket_end + 1
+
+
+def _slice_from_match(match: re.Match) -> Union[int, slice]:
+    """
+    :param match: A match of _SLICE_RE.
+    :return: The index or slice defined by the bracket notation expression.
+    """
+    start, colon, stop, step = match.groups()
+    if colon is None and start is not None:
+        # When only one parameter is given, we use index access instead of slice
+        return int(start)
+
+    return slice(int(start) if start is not None else None,
+                 int(stop) if stop is not None else None,
+                 int(step) if step is not None else None)
+
+
+@lru_cache(maxsize=1024)
+def _json_path_structure_cached(json_path_string: str) -> Tuple[Union[str, int, slice], ...]:
+    """
+    Memoized version of JSONPath._json_path_structure. The same JSONPath strings are parsed over
+    and over when mapping documents, so the parsed structure is cached as an immutable tuple.
+
+    :param json_path_string: JSONPath string representation.
+    :return: A tuple with the JSONPath structure.
+    """
+    return tuple(JSONPath._json_path_structure(json_path_string))
+
+
+class _LazyJSONPath(JSONPath):
+    """
+    A JSONPath built from an already parsed structure. Its string representation is only computed
+    when it is accessed, which avoids formatting intermediate paths and the paths attached to
+    exceptions that are never printed.
+
+    :param json_path_structure: List of string, integer or slice that defines the JSONPath.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, json_path_structure: List[Union[str, int, slice]]) -> None:
+        self._structure = list(json_path_structure)
+        self._raw_json_path = None  # type: Optional[str]
+        self._plain_keys = None
+        self._is_plain = False
+        self._hash = None
+        self._set_root(_root_symbol(self._structure))
+
 
 class JSONNodeType(Enum):
     """
@@ -227,6 +399,13 @@ class JSONNodeType(Enum):
     INFER = 'infer'
 
 
+# Module level aliases of the JSONNodeType members returned by infer_json_type, which avoid going
+# through the Enum attribute lookup on every call.
+_NULL, _OBJECT, _ARRAY, _STRING, _INTEGER, _NUMBER, _BOOLEAN = (
+    JSONNodeType.NULL, JSONNodeType.OBJECT, JSONNodeType.ARRAY, JSONNodeType.STRING,
+    JSONNodeType.INTEGER, JSONNodeType.NUMBER, JSONNodeType.BOOLEAN)
+
+
 class JSONNode():
     """
     Class representing a JSON node, defined by its JSONPath and its type
@@ -234,6 +413,8 @@ class JSONNode():
     :param node_type: A JSONNodeType enumeration specifying the type of the node.
     """
 
+    __slots__ = ('path', 'node_type')
+
     def __init__(self, json_path: str, node_type: JSONNodeType):
         self.path = json_path
         self.node_type = node_type
@@ -248,56 +429,148 @@ def get_item_from_json_path(path: JSONPath, json: Union[Dict, List]) -> Any:
     :raises TypeError: If an item along the JSONPath is not suscriptable.
     :return: Item at the given path from the input json.
     """
-    current_item = json
+    current_item = json  # type: Any
+    plain_keys = path._get_plain_keys()
+    if plain_keys is not None:
+        try:
+            for key in plain_keys:
+                current_item = current_item[key]
+            return current_item
+        except (KeyError, TypeError, IndexError):
+            # Walk again below to find the failing key and raise the appropriate error
+            pass
+
+        current_item = json
     for key_pos, key in enumerate(path.json_path_structure):
         try:
-            if key not in ['$', '@']:
+            if key != '$' and key != '@':
                 current_item = current_item[key]
         except KeyError:
-            raise KeyError('The following path does not exist', path.split(at=key_pos + 1)[0])
+            raise KeyError('The following path does not exist',
+                           _LazyJSONPath(path.slice_structure(key_pos + 1)))
         except TypeError:
-            raise TypeError('The following item is not a dictionary: ', path.split(at=key_pos + 1)[0])
+            raise TypeError('The following item is not a dictionary: ',
+                            _LazyJSONPath(path.slice_structure(key_pos + 1)))
         except IndexError:
-            raise IndexError(
-                f'The item in the following path "{path.split(at=key_pos + 1)[0]}" cannot be accessed',
-                path.split(at=key_pos + 1)[0]
-            )
+            error_at_path = _LazyJSONPath(path.slice_structure(key_pos + 1))
+            raise IndexError(f'The item in the following path "{error_at_path}" cannot be accessed',
+                             error_at_path)
     return current_item
 
 
-def _write_item_in_array(item: Any, in_path: JSONPath, json: Union[Dict, List]) -> Union[Dict, List]:
-    if isinstance(in_path.json_path_structure[-1], slice):
+def get_items_from_json_paths(paths: List[JSONPath], json: Union[Dict, List],
+                              default: Any = None) -> List[Any]:
+    """
+    Gets the items at several JSONPaths of the same json. The paths are merged into a prefix tree
+    so that the json is only accessed once for every prefix they share, instead of walking it from
+    the root for each path.
+
+    :param paths: JSONPaths of the items that are to be accessed.
+    :param json: JSON serializable input from which to obtain the items.
+    :param default: Value returned in place of the items that do not exist.
+    :return: The item at each of the given paths, in the same order as the paths.
+    """
+    items = [default] * len(paths)
+    pending = [(_json_path_trie(paths), json)]  # type: List[Tuple[Tuple[Dict[Any, Any], List[int]], Any]]
+    while pending:
+        (children, path_positions), current_item = pending.pop()
+        for path_position in path_positions:
+            items[path_position] = current_item
+        for key, child in children.values():
+            try:
+                pending.append((child, current_item[key]))
+            except (KeyError, TypeError, IndexError):
+                # None of the paths below this key exist
+                pass
+    return items
+
+
+def _json_path_trie(paths: List[JSONPath]) -> Tuple[Dict, List[int]]:
+    """
+    Builds a prefix tree of the keys of the given JSONPaths, ignoring their '$' and '@' symbols.
+
+    :param paths: JSONPaths to merge.
+    :return: The root node of the tree. Each node is a tuple (children, path_positions) where
+             children maps a hashable form of each key to a tuple (key, child node) and
+             path_positions holds the position in paths of the paths that end at that node.
+    """
+    root = ({}, [])  # type: Tuple[Dict[Any, Any], List[int]]
+    for path_position, path in enumerate(paths):
+        node = root
+        for key in path.json_path_structure:
+            if key == '$' or key == '@':
+                continue
+            # slices are not hashable
+            edge = (key.start, key.stop, key.step) if type(key) is slice else key
+            child = node[0].get(edge)
+            if child is None:
+                child = node[0][edge] = (key, ({}, []))
+            node = child[1]
+        node[1].append(path_position)
+    return root
+
+
+def _probe_path(json_path_structure: List[Union[str, int, slice]],
+                json: Union[Dict, List]) -> Tuple[bool, Any, int]:
+    """
+    Walks the json along a JSONPath structure without raising when the path doesn't exist. It is
+    meant for internal use where a missing item is expected, get_item_from_json_path should be
+    used otherwise.
+
+    :param json_path_structure: The structure of the JSONPath to walk, see JSONPath.
+    :param json: JSON serializable input to walk.
+    :return: A tuple (found, item, position). If the whole path exists found is True and item is the
+             item at the end of the path. Otherwise found is False, item is the last item that
+             could be reached and position is the index in json_path_structure of the first key
+             that could not be accessed.
+    """
+    current_item = json  # type: Any
+    for key_pos, key in enumerate(json_path_structure):
+        if key == '$' or key == '@':
+            continue
+
+        if isinstance(current_item, dict):
+            if isinstance(key, slice) or key not in current_item:
+                return False, current_item, key_pos
+        elif isinstance(current_item, list):
+            if isinstance(key, int):
+                if not -len(current_item) <= key < len(current_item):
+                    return False, current_item, key_pos
+            elif not isinstance(key, slice):
+                return False, current_item, key_pos
+        else:
+            return False, current_item, key_pos
+
+        current_item = current_item[key]
+
+    return True, current_item, len(json_path_structure)
+
+
+def _set_item_in_array(item: Any, in_path: JSONPath, array: List[Any]) -> None:
+    index = in_path.json_path_structure[-1]
+    if isinstance(index, slice):
         raise ValueError('Writing on list slice is not supported.', in_path)
-    if not isinstance(in_path.json_path_structure[-1], int):
+    if not isinstance(index, int):
         raise ValueError(f"Cannot write item into array, {in_path} doesn't point to an array entry.", in_path)
-    array_path, relative_path = in_path.split(-1)
-    array = get_item_from_json_path(array_path, json)
-    if array is None:
-        array = []
-    array_length = len(array)
-    if in_path.json_path_structure[-1] == -1:
+    if index == -1:
         array.append(item)
-    elif in_path.json_path_structure[-1] < -1 or in_path.json_path_structure[-1] > array_length:
+    elif index < -1 or index > len(array):
         raise IndexError(f"Cannot write item into array, {in_path} index is out of bounds.")
     else:
-        array.insert(in_path.json_path_structure[-1], item)
-    return json
+        array.insert(index, item)
 
 
-def _write_item_in_dict(item: Any, in_path: JSONPath, json: Union[Dict, List]) -> Union[Dict, List]:
+def _set_item_in_dict(item: Any, in_path: JSONPath, dictionary: Dict[str, Any]) -> None:
     item_key = in_path.json_path_structure[-1]
     if not isinstance(item_key, str):
         raise ValueError(f"Cannot write item into dictionary, {in_path} doesn't point to a dictionary key.")
-    parent_path, relative_path = in_path.split(-1)
+    if item_key in dictionary:
+        logger.debug("Item at %s already exists. Overwriting it.", in_path)
+    dictionary[item_key] = item
 
-    parent = get_item_from_json_path(parent_path, json)
-    if item_key in parent.keys():
-        logger.debug(f"Item at {in_path} already exists. Overwriting it.")
-    parent.update({in_path.json_path_structure[-1]: item})
-    return json
 
 def _write_item_in_path(item: Any, in_path: JSONPath) -> Union[Dict, List]:
-    for key in reversed(in_path.json_path_structure[1:]):
+    for key in in_path.json_path_structure[:0:-1]:
         if isinstance(key, str):
             item = {key: item}
         elif isinstance(key, int):
@@ -306,7 +579,44 @@ def _write_item_in_path(item: Any, in_path: JSONPath) -> Union[Dict, List]:
     return item
 
 
-def write_item_in_path(item: Any, in_path: JSONPath, json: Union[Dict, List, None]) -> Dict:
+def _copy_spine(json_path_structure: List[Union[str, int, slice]],
+                json: Union[Dict, List]) -> Union[Dict, List]:
+    """
+    Makes a shallow copy of every object and array along a JSONPath structure, those are the only
+    items modified when writing in that path. The copied items are linked together, all the other
+    items are shared with the input json.
+
+    :param json_path_structure: The structure of the JSONPath along which to copy, see JSONPath.
+    :param json: JSON serializable input to copy.
+    :return: The copy of the json.
+    """
+    if not isinstance(json, (dict, list)):
+        return json
+
+    json_copy = json.copy()
+    current_item = json_copy  # type: Any
+    for key in json_path_structure[1:-1]:
+        if isinstance(current_item, dict):
+            if isinstance(key, slice) or key not in current_item:
+                break
+        elif not isinstance(key, int) or not -len(current_item) <= key < len(current_item):
+            break
+
+        child = current_item[key]
+        if not isinstance(child, (dict, list)):
+            break
+        child = child.copy()
+        current_item[key] = child
+        current_item = child
+
+    return json_copy
+
+
+def write_item_in_path(item: Any,
+                       in_path: JSONPath,
+                       json: Union[Dict, List, None],
+                       *,
+                       copy: Optional[str] = None) -> Union[Dict, List]:
     """
     Attempts to write the given item at the JSONPath location. If an item already exists in the
     given JSONPath it will overwrite it.
@@ -315,9 +625,19 @@ def write_item_in_path(item: Any, in_path: JSONPath, json: Union[Dict, List, Non
     :param in_path: JSONPath specifying where to write the item.
     :param json: JSON serializable dictionary or list in which to write the item, if None given it
                  will try to infer the right data structure depending on the given JSONPath.
+    :param copy: Defines if the input json is modified. It defaults to None, writing the item in
+                 place into the input json, which is the cheapest option. If set to 'spine' only
+                 the objects and arrays along in_path are copied, the input json is left untouched
+                 and the result shares all the other items with it. It cannot be used with paths
+                 containing slices, the items reached through a slice are not copied.
     :raises TypeError: If an item along the in_path is not an object and thus cannot contain child attributes.
-    :return: A copy of the input json with the item written in the given JSONPath.
+    :raises ValueError: If the copy parameter is not a supported value, or if it is 'spine' and
+                        in_path contains a slice.
+    :return: The json with the item written in the given JSONPath.
     """
+    if copy not in (None, 'spine'):
+        raise ValueError(f'Unsupported copy value "{copy}", it should be None or "spine".')
+
     if json is None:
         if len(in_path.json_path_structure) == 1:
             return item
@@ -325,30 +645,45 @@ def write_item_in_path(item: Any, in_path: JSONPath, json: Union[Dict, List, Non
             json = []
         else:
             json = {}
-
-    parent_path, item_relative_path = in_path.split(-1)
-    item_key = item_relative_path.json_path_structure[-1]
-
-    try:
-        parent_item = get_item_from_json_path(parent_path, json)
-        if isinstance(parent_item, dict):
-            _write_item_in_dict(item, in_path, json)
-
-        elif isinstance(parent_item, list):
-            _write_item_in_array(item, in_path, json)
-        else:
-            raise TypeError('Cannot write item in path: ', parent_path)
-        return json
-    except (KeyError, TypeError, IndexError) as e:
-        # If the parent item doesnt exist we iteratively create a path of empty items until we get to
-        # the parent
-        error_at_path: JSONPath = e.args[1]
-        logger.debug(f"Path at {error_at_path} doesn't exist.")
-        missing_path = in_path.split(at=len(error_at_path.json_path_structure))[1]
-        logger.debug(f"Creating missing path: {missing_path}")
-
-        missing_item = _write_item_in_path(item, missing_path)
-        return write_item_in_path(missing_item, error_at_path, json)
+    elif copy == 'spine':
+        if any(isinstance(key, slice) for key in in_path.json_path_structure):
+            raise ValueError('Writing through a list slice is not supported with copy="spine".',
+                             in_path)
+        json = _copy_spine(in_path.json_path_structure, json)
+
+    json_path_structure = in_path.json_path_structure
+    parent_length = len(json_path_structure) - 1
+    found, parent_item, missing_at = _probe_path(json_path_structure[:parent_length], json)
+
+    if found and isinstance(parent_item, (dict, list)):
+        missing_at = parent_length
+    else:
+        if found:
+            # The parent exists but it cannot contain items, so it is overwritten
+            missing_at = parent_length - 1
+        elif not isinstance(parent_item, (dict, list)):
+            # An item along the path cannot contain items, so it is overwritten
+            missing_at -= 1
+
+        if missing_at < 1:
+            raise TypeError('Cannot write item in path: ', in_path)
+
+    if missing_at < parent_length:
+        # Items are missing up to the parent, they are all built at once and then written in the
+        # deepest existing item
+        if not isinstance(parent_item, (dict, list)):
+            parent_item = _probe_path(json_path_structure[:missing_at], json)[1]
+        in_path = _LazyJSONPath(in_path.slice_structure(missing_at + 1))
+        logger.debug("Path at %s doesn't exist.", in_path)
+        missing_path = _LazyJSONPath(['@'] + json_path_structure[missing_at + 1:])
+        logger.debug("Creating missing path: %s", missing_path)
+        item = _write_item_in_path(item, missing_path)
+
+    if isinstance(parent_item, dict):
+        _set_item_in_dict(item, in_path, parent_item)
+    else:
+        _set_item_in_array(item, in_path, parent_item)
+    return json
 
 
 def str_is_int(value: str) -> bool:
@@ -360,10 +695,7 @@ def str_is_int(value: str) -> bool:
     if not value or isinstance(value, bool):
         return False
 
-    if value[0] in ['-', '+']:
-        value = value[1:]
-
-    return value.isdigit()
+    return _INT_RE.match(value.strip()) is not None
 
 
 def str_is_float(value: str) -> bool:
@@ -375,18 +707,7 @@ def str_is_float(value: str) -> bool:
     if not value or isinstance(value, bool):
         return False
 
-    if value[0] in ['-', '+']:
-        value = value[1:]
-
-    if value.lower() in ['nan', 'infinity', 'inf']:
-        return False
-
-    try:
-        float(value)
-    except ValueError:
-        return False
-
-    return True
+    return _FLOAT_RE.match(value.strip()) is not None
 
 
 def str_is_bool(value: str) -> bool:
@@ -395,40 +716,70 @@ def str_is_bool(value: str) -> bool:
     :param value:
     :return:
     """
-    return value.lower() in ['true', 'false']
+    return value.lower() in _BOOL_STRINGS
 
 
-def infer_json_type(value: Union[Dict, List, str, float, int, None, bool]) -> JSONNodeType:
+def _classify_str(value: str) -> JSONNodeType:
     """
-    Infers the most apt JSONNodeType of some input value.
-    :param value: An value value for which we want to infer the JSONNodeType.
-    :return: An enum value of JSONNodeType with the best fitting type.
+    Infers the JSONNodeType of a string representation of a value.
+
+    :param value: The string to classify.
+    :return: BOOLEAN, INTEGER or NUMBER if the string represents such a value, STRING otherwise.
     """
-    if value is None:
-        return JSONNodeType.NULL
+    if value.lower() in _BOOL_STRINGS:
+        return _BOOLEAN
 
-    if isinstance(value, Dict):
-        return JSONNodeType.OBJECT
+    # Surrounding whitespace is ignored by int() and float(), which cast the inferred numbers
+    stripped_value = value.strip()
 
-    if isinstance(value, List):
-        return JSONNodeType.ARRAY
+    if _INT_RE.match(stripped_value):
+        return _INTEGER
 
-    if isinstance(value, str):
-        if str_is_bool(value):
-            return JSONNodeType.BOOLEAN
+    if _FLOAT_RE.match(stripped_value):
+        return _NUMBER
+
+    return _STRING
 
-        if str_is_float(value):
-            return JSONNodeType.NUMBER
 
-        if str_is_int(value):
-            return JSONNodeType.INTEGER
+# JSONNodeType of the Python types that map onto a single JSON basetype. str and float need to look
+# at the value itself and are handled by infer_json_type.
+_NODE_TYPE_BY_TYPE = {
+    type(None): _NULL,
+    bool: _BOOLEAN,
+    int: _INTEGER,
+    dict: _OBJECT,
+    list: _ARRAY
+}
+
+
+def infer_json_type(value: Any) -> JSONNodeType:
+    """
+    Infers the most apt JSONNodeType of some input value.
+    :param value: A dict, list, str, float, int, bool or None value for which we want to infer the
+                  JSONNodeType.
+    :return: An enum value of JSONNodeType with the best fitting type.
+    """
+    node_type = _NODE_TYPE_BY_TYPE.get(type(value))
+    if node_type is not None:
+        return node_type
 
-        return JSONNodeType.STRING
+    if isinstance(value, str):
+        return _classify_str(value)
 
     if isinstance(value, float):
-        return JSONNodeType.INTEGER if value.is_integer() else JSONNodeType.NUMBER
+        return _INTEGER if value.is_integer() else _NUMBER
+
+    # Subclasses of the remaining basetypes, e.g. OrderedDict. bool must be checked before int.
+    if isinstance(value, dict):
+        return _OBJECT
+
+    if isinstance(value, list):
+        return _ARRAY
 
     if isinstance(value, bool):
-        return JSONNodeType.BOOLEAN
+        return _BOOLEAN
+
+    if isinstance(value, int):
+        return _INTEGER
 
     raise ValueError('Unable to infer JSON type for {}'.format(value))
@@ -42,6 +42,7 @@ import re
 
 from lxml.etree import parse as xml_parse
 from lxml.etree import ElementTree
+from lxml.etree import XPath as CompiledXPath
 
 from jsonize.utils.xml import XMLNode, XMLNodeType, build_node_tree, generate_nodes, XPath
 from jsonize.utils.json import (JSONNode,
@@ -56,6 +57,10 @@ __author__ = "EUROCONTROL (SWIM)"
 
 logger = logging.getLogger(__name__)
 
+# All the elements below the context element, in document order. Compiled once and reused for every
+# document.
+_DESCENDANT_ELEMENTS = CompiledXPath('descendant::*')
+
 
 class Transformation:
     """
@@ -469,7 +474,7 @@ def iter_map_xml_document_to_dict(xml_document: Path,
     xml_etree = xml_parse(str(xml_document))  # type: ElementTree
     root = xml_etree.getroot()
     root_xpath = XPath(xml_etree.getpath(root))
-    all_elements = xml_etree.iterfind('//*')  # type: Iterable[ElementTree]
+    all_elements = _DESCENDANT_ELEMENTS(root)  # type: Iterable[ElementTree]
 
     for element in all_elements:
         ns_map = element.nsmap
@@ -36,7 +36,10 @@ Details on EUROCONTROL: http://www.eurocontrol.int
 from __future__ import annotations
 
 import re
+import sys
+from bisect import bisect_right
 from enum import Enum
+from functools import lru_cache
 from typing import Tuple, Dict, Iterable, Union, List, Optional
 
 from lxml.etree import ElementTree
@@ -45,6 +48,16 @@ from jsonize.utils.json import JSONPath
 
 __author__ = "EUROCONTROL (SWIM)"
 
+# The index of an element that is part of a sequence, e.g. '[2]'
+_SEQUENCE_INDEX_RE = re.compile(r'\[[0-9]+\]')
+_INDEX_RE = re.compile(r'\[(-?[0-9]+)\]')
+
+# A short namespace prefix, e.g. 'aixm:'
+_NAMESPACE_PREFIX_RE = re.compile(r'[a-zA-Z]+:')
+
+# A full namespace in Clark notation, e.g. '{http://www.w3.org/1999/xlink}'
+_BRACED_NS_RE = re.compile(r'\{([^}]+)\}')
+
 
 class XMLNodeType(Enum):
     VALUE = 'value'
@@ -60,6 +73,8 @@ class XMLNode():
     :param xpath: The XPath of the XML node.
     :param node_type: The XMLNodeType of the XML node.
     """
+    __slots__ = ('path', 'node_type')
+
     def __init__(self, xpath: Union[str, XPath], node_type: XMLNodeType) -> None:
         self.path = XPath(str(xpath))
         self.node_type = node_type
@@ -118,9 +133,9 @@ class XMLNode():
         if self.node_type == XMLNodeType.ATTRIBUTE:
             return True
 
-        return all([not tree_node.is_descendant_of(self)
-                    for tree_node in tree
-                    if not tree_node.node_type == XMLNodeType.ATTRIBUTE])
+        return not any(tree_node.is_descendant_of(self)
+                       for tree_node in tree
+                       if not tree_node.node_type == XMLNodeType.ATTRIBUTE)
 
     def to_jsonize(self,
                    values: str = 'value',
@@ -176,8 +191,8 @@ class XMLNode():
 
         :return: A dictionary containing the Jsonize mapping of the XMLNode.
         """
-        json_path = str(self.path.to_json_path(attributes=attributes,
-                                               with_namespaces=with_namespaces))
+        # The memoized JSONPath string is used directly, there's no need to build a JSONPath
+        json_path = _to_json_path(self.path.raw_xpath, attributes, with_namespaces)
 
         if self.node_type == XMLNodeType.VALUE and values:
             json_path = f'{json_path}.{values}'
@@ -201,13 +216,16 @@ class XMLSequenceNode(XMLNode):
     :param node_type: The XMLNodeType of the XML node.
     :param sub_nodes: An iterable of XML nodes that are contained in each item of the XML sequence.
     """
+    __slots__ = ('sub_nodes',)
+
     def __init__(self,
                  xpath: Union[str, XPath],
                  sub_nodes: Iterable[XMLNode]) -> None:
 
         super().__init__(xpath=xpath, node_type=XMLNodeType.SEQUENCE)
 
-        self.sub_nodes = [node.relative_to(self, in_place=False) for node in sub_nodes]
+        # Stored as a tuple as the sub nodes are fixed once the sequence is built
+        self.sub_nodes = tuple(node.relative_to(self, in_place=False) for node in sub_nodes)
 
     def relative_to(self, ancestor: XMLNode, in_place: bool = True) -> Union[None, XMLNode]:
         """
@@ -283,8 +301,7 @@ class XMLSequenceNode(XMLNode):
                 'path': str(self.path),
                 'type': self.node_type.value},
             'to': {
-               'path': str(self.path.to_json_path(attributes=attributes,
-                                                  with_namespaces=with_namespaces)),
+               'path': _to_json_path(self.path.raw_xpath, attributes, with_namespaces),
                'type': 'array'
            }
        }
@@ -319,30 +336,68 @@ class XPath():
     :param xpath: The string representation of the xpath.
     """
 
+    __slots__ = ('_raw_xpath', '_segments', '_absolute', '_hash')
+
     def __init__(self, xpath: str):
         self.raw_xpath = xpath
 
     @property
-    def _xpath_structure(self):
-        return self.raw_xpath.split('/')
+    def raw_xpath(self) -> str:
+        return self._raw_xpath
+
+    @raw_xpath.setter
+    def raw_xpath(self, xpath: str) -> None:
+        self._raw_xpath = xpath
+        # The XPath is split only once, when it is set. The split is lossless, absolute XPaths start
+        # with an empty segment and relative ones with '.'. The segments repeat across the XPaths of
+        # a document, interning them makes the comparisons of equal segments an identity check.
+        self._segments = tuple(map(sys.intern, xpath.split('/')))  # type: Tuple[str, ...]
+        self._absolute = xpath[:1] == '/'
+        self._hash = hash(self._segments)
+
+    @classmethod
+    def _from_segments(cls, segments: Tuple[str, ...]) -> XPath:
+        """
+        Builds an XPath from the segments of another one, without splitting its string
+        representation again.
+
+        :param segments: Tuple with the segments of the XPath, see XPath.raw_xpath.
+        :return: The XPath defined by the segments.
+        """
+        xpath = cls.__new__(cls)
+        xpath._set_segments(segments)
+        return xpath
+
+    def _set_segments(self, segments: Tuple[str, ...]) -> None:
+        """
+        Updates the XPath from the given segments, see XPath.raw_xpath.
+
+        :param segments: Tuple with the segments of the XPath.
+        """
+        # ''.split('/') gives a single empty segment, e.g. the parent of a single segment XPath
+        segments = segments or ('',)
+        self._raw_xpath = '/'.join(segments)
+        self._segments = segments
+        self._absolute = self._raw_xpath[:1] == '/'
+        self._hash = hash(segments)
 
     def is_absolute(self) -> bool:
         """
         :return: Boolean indicating if the XPath is absolute.
         """
-        return self.raw_xpath[0] == '/'
+        return self._absolute
 
     def is_relative(self) -> bool:
         """
         :return: Boolean indicating if the XPath is relative.
         """
-        return '.' in self._xpath_structure[0]
+        return not self._absolute
 
     def is_attribute(self) -> bool:
         """
         :return: Boolean indicating if the XPath refers to an attribute node.
         """
-        return self._xpath_structure[-1][0] == '@'
+        return self._segments[-1][:1] == '@'
 
     def is_descendant_of(self, ancestor: XPath) -> bool:
         """
@@ -352,23 +407,26 @@ class XPath():
                          descendant.
         :return: True if the node is a descendant of ancestor, False otherwise.
         """
-        return f'{ancestor.raw_xpath}/' in self.raw_xpath and not self == ancestor
+        ancestor_segments = ancestor._segments
+        return (len(self._segments) > len(ancestor_segments)
+                and self._segments[:len(ancestor_segments)] == ancestor_segments)
 
     def attribute_name(self) -> str:
         """
         :return: Name of the attribute node.
         :raises ValueError: If the XPath does not refer to an attribute node.
         """
-        if not self.is_attribute():
+        last_segment = self._segments[-1]
+        if last_segment[:1] != '@':
             raise ValueError('The given xpath does not refer to an attribute.')
 
-        return self._xpath_structure[-1][1:]
+        return last_segment[1:]
 
     def parent(self) -> XPath:
         """
         :return: An XPath representation of the parent element.
         """
-        return XPath('/'.join(self._xpath_structure[:-1]))
+        return XPath._from_segments(self._segments[:-1])
 
     def split(self, at: int) -> Tuple[XPath, XPath]:
         """
@@ -379,8 +437,8 @@ class XPath():
                  and the second one the relative XPath after the split location.
         """
         if at > 0:
-            return (XPath('/'.join(self._xpath_structure[:at])),
-                    XPath('/'.join(['.'] + self._xpath_structure[at:])))
+            return (XPath._from_segments(self._segments[:at]),
+                    XPath._from_segments(('.',) + self._segments[at:]))
         else:
             raise ValueError(f"at={at} parameter should be greater than 0.")
 
@@ -411,25 +469,12 @@ class XPath():
                                     'False': $.element.subelement
         :return: A JSONPath representation of the XPath.
         """
-        json_path = self.raw_xpath if with_namespaces else re.sub(r'[a-zA-Z]+:', '', self.raw_xpath)
-
-        json_path = re.sub(r'/@', '/' + attributes, json_path)
-        json_path = re.sub(r'^\./', '@/', json_path)
-        json_path = re.sub(r'^/', '$/', json_path)
-        json_path = re.sub(r'/', '.', json_path)
-        json_path = JSONPath(json_path)
-        json_path_structure = []
-        for path_key in json_path.json_path_structure:
-            if isinstance(path_key, int):
-                if path_key <= 0:
-                    raise ValueError(f"An XPath expression cannot contain an index <= 0, xpath= {self}")
-                path_key += -1
-            json_path_structure.append(path_key)
-        return JSONPath.from_json_path_structure(json_path_structure)
+        return JSONPath(_to_json_path(self.raw_xpath, attributes, with_namespaces))
 
     def relative_to(self, ancestor: XPath, in_place: bool = True) -> Union[None, XPath]:
         """
-        Makes the XPath relative to a given ancestor.
+        Makes the XPath relative to a given ancestor. If the XPath does not start with the ancestor
+        it is left unchanged.
 
         :param ancestor: An XPath to which we want to make the current one relative to.
         :param in_place: If True the current instance will be updated (returns None). If False, a
@@ -438,20 +483,30 @@ class XPath():
         :return: None or a new instance of XPath with the relative path, as defined by the in_place
                  parameter.
         """
-        xpath = re.sub(r'^{}'.format(re.escape(str(ancestor))), '.', self.raw_xpath)
+        ancestor_segments = ancestor._segments
+        if self._segments[:len(ancestor_segments)] == ancestor_segments:
+            segments = ('.',) + self._segments[len(ancestor_segments):]
+        else:
+            segments = self._segments
 
         if not in_place:
-            return XPath(xpath)
+            return XPath._from_segments(segments)
 
-        self.raw_xpath = xpath
+        if segments is not self._segments:
+            self._set_segments(segments)
 
     def shorten_namespaces(self,
                            xml_namespaces: Dict[str, str],
                            in_place: bool = True) -> Union[None, XPath]:
 
-        xpath = re.sub(r'\{([^\}]+)\}',
-                       lambda x: get_short_namespace(x.group(1), xml_namespaces) + ':',
-                       self.raw_xpath)
+        xpath = self.raw_xpath
+        if '{' in xpath:
+            short_namespaces = _invert_namespaces(xml_namespaces)
+
+            def prefix(match):
+                return _namespace_prefix(match.group(1), short_namespaces)
+
+            xpath = _BRACED_NS_RE.sub(prefix, xpath)
 
         if not in_place:
             return XPath(xpath)
@@ -472,7 +527,13 @@ class XPath():
         :return: None or a new instance of XPath with the new XPath with indices removed, as
                  defined by the in_place parameter.
         """
-        xpath = re.sub(r'\[[0-9]+\]', '', self.raw_xpath)
+        if '[' not in self._raw_xpath:
+            # There are no indices to remove, the XPath doesn't need to be split again
+            if not in_place:
+                return XPath._from_segments(self._segments)
+            return None
+
+        xpath = _SEQUENCE_INDEX_RE.sub('', self._raw_xpath)
 
         if not in_place:
             return XPath(xpath)
@@ -497,9 +558,9 @@ class XPath():
         :param infer_sequence: Boolean indicating if elements part of a sequence will be inferred as SEQUENCE.
         :return: XMLNodeType that is inferred from the XPath.
         """
-        if '@' in self._xpath_structure[-1]:
+        if '@' in self._segments[-1]:
             node_type = XMLNodeType.ATTRIBUTE
-        elif re.search(r'\[[0-9]+\]', self._xpath_structure[-1]) and infer_sequence:
+        elif infer_sequence and _SEQUENCE_INDEX_RE.search(self._segments[-1]):
             node_type = XMLNodeType.SEQUENCE
         else:
             node_type = XMLNodeType.VALUE
@@ -512,10 +573,68 @@ class XPath():
         return self.raw_xpath
 
     def __hash__(self):
-        return hash(self.raw_xpath)
+        return self._hash
 
     def __eq__(self, other: XPath):
-        return isinstance(other, XPath) and other.raw_xpath == self.raw_xpath
+        if self is other:
+            return True
+        # Different cached hashes rule out equality without comparing the segments
+        return (isinstance(other, XPath)
+                and other._hash == self._hash
+                and other._segments == self._segments)
+
+
+@lru_cache(maxsize=4096)
+def _to_json_path(xpath: str, attributes: str, with_namespaces: bool) -> str:
+    """
+    Memoized conversion of an XPath string into its JSONPath string, see XPath.to_json_path. When
+    mapping documents the same XPaths are converted once per matching XML node.
+
+    :param xpath: The string representation of the XPath.
+    :param attributes: The tag that will precede an XML attribute name in JSONPath.
+    :param with_namespaces: Whether shortened namespaces are kept in the JSONPath.
+    :return: The string representation of the JSONPath.
+    """
+    segments = xpath.split('/')
+
+    root = segments[0] if with_namespaces else _NAMESPACE_PREFIX_RE.sub('', segments[0])
+    if len(segments) > 1:
+        if root == '.':
+            root = '@'
+        elif root == '':
+            root = '$'
+
+    json_path = '.'.join([root] + [_to_json_path_key(segment, attributes, with_namespaces)
+                                   for segment in segments[1:]])
+
+    def decrement_index(match):
+        index = int(match.group(1))
+        if index <= 0:
+            raise ValueError(f"An XPath expression cannot contain an index <= 0, xpath= {xpath}")
+        return f'[{index - 1}]'
+
+    # XPath indices start at 1 while JSONPath ones start at 0
+    return _INDEX_RE.sub(decrement_index, json_path)
+
+
+@lru_cache(maxsize=4096)
+def _to_json_path_key(segment: str, attributes: str, with_namespaces: bool) -> str:
+    """
+    Converts a non root XPath segment into its JSONPath key, see _to_json_path. The same segments
+    are found in many XPaths of a document.
+
+    :param segment: A segment of an XPath, other than the first one.
+    :param attributes: The tag that will precede an XML attribute name in JSONPath.
+    :param with_namespaces: Whether shortened namespaces are kept in the JSONPath.
+    :return: The JSONPath key.
+    """
+    if not with_namespaces:
+        segment = _NAMESPACE_PREFIX_RE.sub('', segment)
+
+    if segment[:1] == '@':
+        segment = attributes + segment[1:]
+
+    return segment
 
 
 class XMLNodeTree():
@@ -526,8 +645,10 @@ class XMLNodeTree():
     given XML.
     :param nodes: An iterable of XMLNode.
     """
+    __slots__ = ('nodes',)
+
     def __init__(self, nodes: Iterable[XMLNode] = None):
-        self.nodes = nodes or []
+        self.nodes = list(nodes) if nodes else []
 
     def to_jsonize(self, values: str = 'value', attributes: str = '', with_namespaces: bool = True):
         return [
@@ -536,6 +657,69 @@ class XMLNodeTree():
         ]
 
 
+def _invert_namespaces(xml_namespaces: Dict[str, str]) -> Dict[str, str]:
+    """
+    :param xml_namespaces: A dictionary containing the mapping between short namespace (keys) and
+                           long namespace (values).
+    :return: A dictionary mapping each long namespace to its short namespace. If a long namespace
+             has several short namespaces, the first one is kept. It is shared between calls and
+             must not be modified.
+    """
+    return _invert_namespace_items(tuple(xml_namespaces.items()))
+
+
+@lru_cache(maxsize=64)
+def _invert_namespace_items(namespace_items: Tuple[Tuple[str, str], ...]) -> Dict[str, str]:
+    """
+    Memoized inversion of the namespaces, see _invert_namespaces. The same few namespace
+    dictionaries are used for all the XPaths of a document.
+
+    :param namespace_items: The (short namespace, long namespace) items of the namespaces.
+    :return: A dictionary mapping each long namespace to its first short namespace.
+    """
+    short_namespaces = {}  # type: Dict[str, str]
+    for short_ns, full_ns in namespace_items:
+        short_namespaces.setdefault(full_ns, sys.intern(short_ns) if short_ns else short_ns)
+    return short_namespaces
+
+
+def _leaf_index(nodes: Iterable[XMLNode]) -> List[Tuple[str, ...]]:
+    """
+    Indexes nodes to test many nodes against them with _is_leaf, each test becomes a binary search
+    instead of a scan of all the nodes. The index is a snapshot of the nodes.
+
+    :param nodes: An iterable of XMLNode containing each node of the XML tree.
+    :return: Sorted list of the XPath segments of the non attribute nodes, the descendants of a
+             node follow it immediately.
+    """
+    return sorted(node.path._segments for node in nodes
+                  if node.node_type != XMLNodeType.ATTRIBUTE)
+
+
+def _is_leaf(node: XMLNode, leaf_index: List[Tuple[str, ...]]) -> bool:
+    """
+    Same as XMLNode.is_leaf, with the tree given as a leaf index.
+
+    :param node: The XMLNode to test.
+    :param leaf_index: Sorted list of XPath segments, see _leaf_index.
+    :return: True if the node is not an ancestor of any of the nodes in the index, False otherwise.
+    """
+    return node.node_type == XMLNodeType.ATTRIBUTE or not _has_descendant(leaf_index,
+                                                                          node.path._segments)
+
+
+def _has_descendant(leaf_index: List[Tuple[str, ...]], segments: Tuple[str, ...]) -> bool:
+    """
+    :param leaf_index: Sorted list of XPath segments, see _leaf_index.
+    :param segments: Segments of the XPath of a node.
+    :return: True if any of the XPaths in leaf_index is a descendant of the node, False otherwise.
+    """
+    # Any descendant sorts after the node itself and before any other following XPath
+    position = bisect_right(leaf_index, segments)
+    return (position < len(leaf_index)
+            and leaf_index[position][:len(segments)] == segments)
+
+
 def get_short_namespace(full_ns: str, xml_namespaces: Dict[str, str]) -> str:
     """
     Inverse search of a short namespace by its full namespace value.
@@ -546,11 +730,25 @@ def get_short_namespace(full_ns: str, xml_namespaces: Dict[str, str]) -> str:
     :return: If the full namespace is found in the dictionary, returns the short namespace.
     :raise KeyError: If the full namespace is not found in the dictionary.
     """
-    for key, value in xml_namespaces.items():
-        if full_ns == value:
-            return key
+    # The prefix without its trailing ':', an empty prefix stays empty
+    return _namespace_prefix(full_ns, _invert_namespaces(xml_namespaces))[:-1]
+
+
+def _namespace_prefix(full_ns: str, short_namespaces: Dict[str, str]) -> str:
+    """
+    :param full_ns: The full namespace to replace.
+    :param short_namespaces: A dictionary mapping long namespaces to short namespaces, see
+                             _invert_namespaces.
+    :return: The short namespace followed by ':', or an empty string if the short namespace is
+             empty.
+    :raise KeyError: If the full namespace is not found in short_namespaces.
+    """
+    try:
+        short_ns = short_namespaces[full_ns]
+    except KeyError:
+        raise KeyError('The namespace is not found in "xml_namespaces".', full_ns) from None
 
-    raise KeyError('The namespace is not found in "xml_namespaces".', full_ns)
+    return f'{short_ns}:' if short_ns else ''
 
 
 def generate_node_xpaths(root: ElementTree,
@@ -562,16 +760,95 @@ def generate_node_xpaths(root: ElementTree,
     :param xml_namespaces: A dictionary containing the mapping of the namespaces.
     :return: A generator that yields all the possible XPaths.
     """
-    all_elements = root.iterfind('//*')  # type: Iterable[ElementTree]
+    # The XPaths are built top-down, each one from the XPath of its parent, instead of computing
+    # every one of them from the root with getpath. Only the document element uses getpath, and it
+    # is not yielded itself.
+    document_element = root.getroot()
+    pending = [(document_element, root.getpath(document_element))]
+    short_namespaces = _invert_namespaces(xml_namespaces) if xml_namespaces else {}
+
+    while pending:
+        element, element_path = pending.pop()
+
+        if element is not document_element:
+            # Element names are already prefixed as in getpath, only the attribute names can be in
+            # Clark notation.
+            yield XPath(element_path)
+
+            for attrib_name in element.attrib.keys():
+                yield XPath(f'{element_path}/@{_shorten_name(attrib_name, short_namespaces)}')
+
+        child_paths = _child_xpaths(element, element_path)
+        # Reversed so that the elements are yielded in document order
+        child_paths.reverse()
+        pending.extend(child_paths)
+
+
+def _shorten_name(name: str, short_namespaces: Dict[str, str]) -> str:
+    """
+    Replaces the full namespace of a name in Clark notation by its short namespace, e.g.
+    '{http://www.w3.org/1999/xlink}href' becomes 'xlink:href'.
+
+    :param name: The name of an element or attribute.
+    :param short_namespaces: A dictionary mapping long namespaces to short namespaces, see
+                             _invert_namespaces.
+    :return: The name with a short namespace prefix, if any.
+    :raise KeyError: If the full namespace is not found in short_namespaces.
+    """
+    if name[0] != '{':
+        return name
 
-    for element in all_elements:
-        element_path = root.getpath(element)
-        attribs = (f'{element_path}/@{attrib_name}' for attrib_name, _ in element.attrib.items())
+    namespace_end = name.index('}')
+    return _namespace_prefix(name[1:namespace_end], short_namespaces) + name[namespace_end + 1:]
 
-        yield XPath(element_path).shorten_namespaces(xml_namespaces, in_place=False)
 
-        for attrib in attribs:
-            yield XPath(attrib).shorten_namespaces(xml_namespaces, in_place=False)
+def _child_xpaths(parent: ElementTree, parent_path: str) -> List[Tuple[ElementTree, str]]:
+    """
+    Computes the XPaths of the child elements of an element, named and indexed as lxml's getpath
+    (libxml2's xmlGetNodePath) does:
+        - Elements in a prefixed namespace are named 'prefix:name'.
+        - Elements in the default namespace cannot be named in XPath, '*' is used instead and they
+          are indexed among all the child elements.
+        - Other elements are indexed among the child elements with the same name and namespace
+          prefix. The index is only added if there is more than one of them.
+
+    :param parent: The parent element.
+    :param parent_path: The XPath of the parent element.
+    :return: A list of tuples (child element, XPath of the child element) in document order.
+    """
+    # Comments and processing instructions are not elements
+    children = [child for child in parent if isinstance(child.tag, str)]
+
+    names = []
+    name_counts = {}  # type: Dict[str, int]
+    for child in children:
+        tag = child.tag
+        if tag[0] != '{':
+            name = tag
+        elif child.prefix is None:
+            name = '*'
+        else:
+            name = f'{child.prefix}:{tag[tag.index("}") + 1:]}'
+        names.append(name)
+        name_counts[name] = name_counts.get(name, 0) + 1
+
+    child_paths = []
+    name_indices = {}  # type: Dict[str, int]
+    for child, name in zip(children, names):
+        if name == '*':
+            index = len(child_paths) + 1
+            count = len(children)
+        else:
+            index = name_indices.get(name, 0) + 1
+            name_indices[name] = index
+            count = name_counts[name]
+
+        if count > 1:
+            child_paths.append((child, f'{parent_path}/{name}[{index}]'))
+        else:
+            child_paths.append((child, f'{parent_path}/{name}'))
+
+    return child_paths
 
 
 def generate_nodes(tree: ElementTree, xml_namespaces: Dict[str, str] = None, clean_sequence_index: bool = False) -> Iterable[XMLNode]:
@@ -604,8 +881,9 @@ def build_sequence_tree(
     trimmed_sequence_indices = []
     trimmed_leaf_indices = []
     deepest_sequences = []
+    sequence_index = _leaf_index(sequence_nodes)
     for i, node in enumerate(sequence_nodes):
-        if node.is_leaf(sequence_nodes):
+        if _is_leaf(node, sequence_index):
             sequence_node_leaves = []
             for ix, leaf in enumerate(leaf_nodes):
                 if leaf.is_descendant_of(node):
@@ -651,9 +929,10 @@ def build_node_tree(tree: ElementTree, xml_namespaces: Dict[str, str] = None) ->
             sequence_node_xpaths.add(node_xpath)
 
 
+    all_nodes_index = _leaf_index(all_nodes)
     leaves = [
         node for node in all_nodes
-        if node.is_leaf(all_nodes) and node.node_type != XMLNodeType.SEQUENCE
+        if _is_leaf(node, all_nodes_index) and node.node_type != XMLNodeType.SEQUENCE
     ]
 
     sequences = [
@@ -673,10 +952,7 @@ def find_namespaces(tree: ElementTree) -> Dict[str, str]:
     :param tree: An lxml ElementTree containing the XML document from which to extract the namespaces.
     :return: A dictionary containing the mapping between short namespace and full namespace.
     """
-    root = tree.getroot()
-    namespaces = root.nsmap
-    try:
-        namespaces.pop(None)
-    except KeyError:
-        pass
-    return namespaces
+    # Only the root element is inspected, its nsmap is a single C-level collection of the
+    # namespaces in scope. The default namespace has no prefix and cannot be used in XPaths.
+    return {prefix: namespace for prefix, namespace in tree.getroot().nsmap.items()
+            if prefix is not None}
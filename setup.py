@@ -1,10 +1,22 @@
 __author__ = 'EUROCONTROL (SWIM)'
 
+import os
+
 import setuptools
 
 with open("README.md", "r") as fh:
     long_description = fh.read()
 
+# Optionally compile the JSONPath walkers to a C extension with mypyc, e.g.:
+#     JSONIZE_USE_MYPYC=1 pip install .
+# The pure Python module is used whenever the compiled one is not available.
+ext_modules = []
+if os.environ.get('JSONIZE_USE_MYPYC') == '1':
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(['--follow-imports=silent', '--ignore-missing-imports',
+                            'jsonize/utils/json.py'])
+
 setuptools.setup(
     name="jsonize",
     version="0.1.0",
@@ -15,6 +27,7 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/eurocontrol-swim/jsonize",
     packages=setuptools.find_packages(),
+    ext_modules=ext_modules,
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -23,7 +36,6 @@ setuptools.setup(
     python_requires='>=3.6',
     install_requires=[
         'jsonschema>=3.2.0',
-        'pyparsing>=2.4.6',
         'lxml>=4.5.0'
     ]
 )
@@ -1,5 +1,5 @@
 from jsonize.utils.json import *
-from jsonize.utils.json import _write_item_in_array, _write_item_in_dict, _write_item_in_path
+from jsonize.utils.json import _set_item_in_array, _write_item_in_path
 from copy import deepcopy
 import unittest
 
@@ -57,6 +57,15 @@ class TestGetItemJSONPath(unittest.TestCase):
                  'key2': [0, 1, [{'key3': True}, {'key4': False}]]}
         self.assertEqual(get_item_from_json_path(JSONPath('$.key2[2][-1].key4'), input), False)
 
+    def test_get_items_from_json_paths(self):
+        input = {'key1': 43,
+                 'key2': [0, 1, [{'key3': True}, {'key4': False}]]}
+        json_paths = [JSONPath('$.key2[2][-1].key4'), JSONPath('$.key1'), JSONPath('$.key2[1:]'),
+                      JSONPath('$.missing.key1'), JSONPath('$.key2[2][0].key3'), JSONPath('@'),
+                      JSONPath('$.key2[2][-1].key4')]
+        reference_items = [False, 43, [1, [{'key3': True}, {'key4': False}]], 'default', True, input, False]
+        self.assertEqual(get_items_from_json_paths(json_paths, input, default='default'), reference_items)
+
 
 class TestWriteItemJSONPath(unittest.TestCase):
 
@@ -128,18 +137,18 @@ class TestWriteItemJSONPath(unittest.TestCase):
             reference = {'key1': True,
                          'key2': {'key3': [{'key4': 42}, {'key5': 43}]}
                          }
-            result = _write_item_in_array({'key5': 43}, JSONPath('$.key2.key3[-1]'), initial)
-            self.assertEqual(reference, result)
+            _set_item_in_array({'key5': 43}, JSONPath('$.key2.key3[-1]'), initial['key2']['key3'])
+            self.assertEqual(reference, initial)
         with self.subTest('write item in array at root'):
             initial = []
             reference = [3]
-            result = _write_item_in_array(3, JSONPath('$[0]'), initial)
-            self.assertEqual(reference, result)
+            _set_item_in_array(3, JSONPath('$[0]'), initial)
+            self.assertEqual(reference, initial)
         with self.subTest('write item in array at relative root'):
             initial = []
             reference = [5]
-            result = _write_item_in_array(5, JSONPath('@[0]'), initial)
-            self.assertEqual(reference, result)
+            _set_item_in_array(5, JSONPath('@[0]'), initial)
+            self.assertEqual(reference, initial)
         with self.subTest('write item in array in nested location'):
             initial = {'key1': 1,
                        'key2': {'key3': [1, 1, 2, 3, 5],
@@ -149,8 +158,8 @@ class TestWriteItemJSONPath(unittest.TestCase):
                          'key2': {'key3': [1, 1, 8, 2, 3, 5],
                                   'key4': 5}
                          }
-            result = _write_item_in_array(8, JSONPath('$.key2.key3[2]'), initial)
-            self.assertEqual(reference, result)
+            _set_item_in_array(8, JSONPath('$.key2.key3[2]'), initial['key2']['key3'])
+            self.assertEqual(reference, initial)
 
     def test_write_item_nested_arrays(self):
         with self.subTest():
@@ -164,13 +173,15 @@ class TestWriteItemJSONPath(unittest.TestCase):
                        'key2': [[0, 1, 2], [3, 4, 5], [6, 7, 8]]}
             reference = {'key1': 43,
                          'key2': [[0, 1, 2], [3, 4, 5], [6, 7, 8, 9]]}
-            self.assertEqual(_write_item_in_array(9, JSONPath('$.key2[2][3]'), initial), reference)
+            _set_item_in_array(9, JSONPath('$.key2[2][3]'), initial['key2'][2])
+            self.assertEqual(initial, reference)
         with self.subTest():
             initial = {'key1': 43,
                        'key2': [[0, 1, 2], [3, 4, 5], [6, 7, 8]]}
             reference = {'key1': 43,
                          'key2': [[0, 1, 2], [3, 4, 5], [6, 7, 8, 9]]}
-            self.assertEqual(_write_item_in_array(9, JSONPath('$.key2[-1][-1]'), initial), reference)
+            _set_item_in_array(9, JSONPath('$.key2[-1][-1]'), initial['key2'][-1])
+            self.assertEqual(initial, reference)
 
     def test_write_deep_item_in_array(self):
         with self.subTest('write new deep item in array'):
@@ -195,6 +206,29 @@ class TestWriteItemJSONPath(unittest.TestCase):
                          }
             self.assertEqual(write_item_in_path(43, JSONPath('$.key2.key3[1].subelement'), initial), reference)
 
+    def test_write_item_copying_spine(self):
+        initial = {'key1': {'key2': [1, 2]},
+                   'key3': {'key4': True}}
+        reference = {'key1': {'key2': [1, 2, 3]},
+                     'key3': {'key4': True}}
+        result = write_item_in_path(3, JSONPath('$.key1.key2[-1]'), initial, copy='spine')
+        with self.subTest('item is written'):
+            self.assertEqual(result, reference)
+        with self.subTest('input is untouched'):
+            self.assertEqual(initial, {'key1': {'key2': [1, 2]}, 'key3': {'key4': True}})
+        with self.subTest('items outside the path are shared'):
+            self.assertIs(result['key3'], initial['key3'])
+
+    def test_write_item_copying_spine_through_slice(self):
+        initial = {'key1': [{'key2': 1}]}
+        with self.assertRaises(ValueError):
+            write_item_in_path(9, JSONPath('$.key1[0:2][0].key3'), initial, copy='spine')
+        self.assertEqual(initial, {'key1': [{'key2': 1}]})
+
+    def test_write_item_invalid_copy(self):
+        with self.assertRaises(ValueError):
+            write_item_in_path(3, JSONPath('$.key1'), {}, copy='deep')
+
 
 class TestJSONPath(unittest.TestCase):
 
@@ -245,6 +279,13 @@ class TestJSONPath(unittest.TestCase):
         path.append(JSONPath('@.key3.key4'))
         self.assertEqual(reference, path)
 
+    def test_append_to_parsed_path(self):
+        path = JSONPath('$.key1')
+        self.assertEqual(get_item_from_json_path(path, {'key1': {'key2': [42]}}), {'key2': [42]})
+        path.append(JSONPath('@.key2[0]'))
+        self.assertEqual(path.json_path_structure, ['$', 'key1', 'key2', 0])
+        self.assertEqual(get_item_from_json_path(path, {'key1': {'key2': [42]}}), 42)
+
     def test_fail_append(self):
         with self.assertRaises(ValueError):
             reference = JSONPath('$.key1.key2.key3.key4')
@@ -290,6 +331,38 @@ class TestJSONPath(unittest.TestCase):
             reference_path_structure = ['@', slice(None, 3), 'key2', 'key3']
             self.assertEqual(JSONPath.string_representation(reference_path_structure), reference_string)
 
+    def test_zero_valued_bounds(self):
+        cases = [('$.key1[0]', ['$', 'key1', 0]),
+                 ('$.key1[0:3]', ['$', 'key1', slice(0, 3)]),
+                 ('$.key1[1:0]', ['$', 'key1', slice(1, 0)]),
+                 ('$.key1[0:0:-1]', ['$', 'key1', slice(0, 0, -1)])]
+
+        for json_path_string, reference_path_structure in cases:
+            with self.subTest(json_path=json_path_string):
+                self.assertEqual(JSONPath(json_path_string).json_path_structure, reference_path_structure)
+                self.assertEqual(JSONPath.string_representation(reference_path_structure), json_path_string)
+
+    def test_string_representation_keeps_structure(self):
+        path_structure = ['$', 'key1', 2, slice(None, 3)]
+        JSONPath.string_representation(path_structure)
+        self.assertEqual(path_structure, ['$', 'key1', 2, slice(None, 3)])
+
+    def test_not_equal_to_other_types(self):
+        self.assertNotEqual(JSONPath('$.key1'), '$.key1')
+
+    def test_hash_consistent_with_eq(self):
+        json_path_1 = JSONPath('$.key1[1:3:]')
+        json_path_2 = JSONPath.from_json_path_structure(['$', 'key1', slice(1, 3)])
+        self.assertEqual(json_path_1, json_path_2)
+        self.assertEqual(hash(json_path_1), hash(json_path_2))
+        self.assertEqual(len({json_path_1, json_path_2}), 1)
+
+    def test_hash_after_append(self):
+        json_path = JSONPath('$.key1')
+        hash(json_path)
+        json_path.append(JSONPath('@.key2'))
+        self.assertEqual(hash(json_path), hash(JSONPath('$.key1.key2')))
+
     def test_build_from_path_structure(self):
         with self.subTest():
             from_string = JSONPath('$')
@@ -343,6 +416,37 @@ class TestStringCasting(unittest.TestCase):
 
         with self.subTest():
             self.assertFalse(str_is_float(self.value_5))
+        with self.subTest():
+            self.assertTrue(str_is_float(' 1_000.5 '))
+
+
+class TestInferJSONType(unittest.TestCase):
+    def test_infer_from_str(self):
+        cases = [('true', JSONNodeType.BOOLEAN), ('False', JSONNodeType.BOOLEAN),
+                 ('3', JSONNodeType.INTEGER), ('-4', JSONNodeType.INTEGER),
+                 ('2.0', JSONNodeType.NUMBER), ('.5', JSONNodeType.NUMBER),
+                 ('1e5', JSONNodeType.NUMBER), ('inf', JSONNodeType.STRING),
+                 ('nan', JSONNodeType.STRING), ('', JSONNodeType.STRING), ('abc', JSONNodeType.STRING),
+                 (' 5 ', JSONNodeType.INTEGER), ('1_000', JSONNodeType.INTEGER),
+                 (' 2.5\n', JSONNodeType.NUMBER), ('1_0.0_5', JSONNodeType.NUMBER),
+                 ('1__0', JSONNodeType.STRING), ('_1', JSONNodeType.STRING)]
+
+        for value, node_type in cases:
+            with self.subTest(value=value):
+                self.assertEqual(infer_json_type(value), node_type)
+
+    def test_infer_from_basetypes(self):
+        cases = [(None, JSONNodeType.NULL), (True, JSONNodeType.BOOLEAN), (0, JSONNodeType.INTEGER),
+                 (2.0, JSONNodeType.INTEGER), (2.5, JSONNodeType.NUMBER), ({}, JSONNodeType.OBJECT),
+                 ([], JSONNodeType.ARRAY)]
+
+        for value, node_type in cases:
+            with self.subTest(value=value):
+                self.assertEqual(infer_json_type(value), node_type)
+
+    def test_infer_unsupported_type(self):
+        with self.assertRaises(ValueError):
+            infer_json_type(object())
 
 
 if __name__ == '__main__':
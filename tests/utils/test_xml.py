@@ -1,6 +1,6 @@
 import unittest
 from jsonize.utils.xml import XPath, XMLNode, XMLNodeType, XMLSequenceNode, XMLNodeTree, \
-    get_short_namespace, find_namespaces, generate_node_xpaths
+    get_short_namespace, find_namespaces, generate_node_xpaths, _leaf_index, _is_leaf
 from jsonize.utils.json import JSONPath
 from pathlib import Path
 from lxml import etree
@@ -63,6 +63,11 @@ class TestXPathManipulations(unittest.TestCase):
                 xpath.relative_to(parent, in_place=True)
                 self.assertEqual(xpath, reference)
 
+        with self.subTest():
+            xpath = XPath('/root/elemental/subelement')
+            parent = XPath('/root/element')
+            self.assertEqual(xpath.relative_to(parent, in_place=False), xpath)
+
 
 class TestInferJsonPath(unittest.TestCase):
 
@@ -131,6 +136,11 @@ class TestXPathRelations(unittest.TestCase):
             not_descendant = XPath('/root/elemental')
             self.assertFalse(not_descendant.is_descendant_of(ancestor))
 
+        with self.subTest():
+            ancestor = XPath('/root/element')
+            not_descendant = XPath('/other/root/element/subelement')
+            self.assertFalse(not_descendant.is_descendant_of(ancestor))
+
     def test_is_leaf(self):
         all_nodes = [XMLNode('/root/element/@attrib', XMLNodeType.ATTRIBUTE),
                      XMLNode('/root/element/subelement/subsubelement', XMLNodeType.ELEMENT),
@@ -145,6 +155,23 @@ class TestXPathRelations(unittest.TestCase):
         with self.subTest():
             self.assertFalse(XMLNode('/root/element', XMLNodeType.ELEMENT).is_leaf(all_nodes))
 
+    def test_is_leaf_in_leaf_index(self):
+        all_nodes = [XMLNode('/root/element/@attrib', XMLNodeType.ATTRIBUTE),
+                     XMLNode('/root/element/subelement/subsubelement', XMLNodeType.ELEMENT),
+                     XMLNode('/root/anotherElement', XMLNodeType.ELEMENT),
+                     XMLNode('/root/element', XMLNodeType.ELEMENT),
+                     XMLNode('/root/elemental', XMLNodeType.ELEMENT)]
+        leaf_index = _leaf_index(all_nodes)
+        for node in all_nodes:
+            with self.subTest(node=node):
+                self.assertEqual(_is_leaf(node, leaf_index), node.is_leaf(all_nodes))
+        with self.subTest():
+            self.assertFalse(_is_leaf(XMLNode('/root', XMLNodeType.ELEMENT), leaf_index))
+
+    def test_node_tree_from_generator(self):
+        node_tree = XMLNodeTree(XMLNode(path, XMLNodeType.VALUE) for path in ['/a/b', '/a/c'])
+        self.assertEqual(len(node_tree.to_jsonize()), 2)
+
     def test_is_attribute(self):
         attribute_node = XPath('/root/element/@attribute')
         ns_attribute_node = XPath('/ns:root/nss:element/@nss:attribute')
@@ -171,6 +198,8 @@ class TestXPathRelations(unittest.TestCase):
             self.assertFalse(absolute_xpath.is_relative())
         with self.subTest():
             self.assertTrue(relative_xpath.is_relative())
+        with self.subTest():
+            self.assertTrue(XPath('element/@attribute').is_relative())
 
     def test_attribute_name(self):
         attribute_xpath = XPath('./element/@attri')
@@ -191,6 +220,10 @@ class TestXPathRelations(unittest.TestCase):
             self.assertEqual(absolute_attribute_xpath.parent(), XPath('/ns:root/nss:element'))
         with self.subTest():
             self.assertEqual(relative_element_xpath.parent(), XPath('./element'))
+        with self.subTest():
+            single_segment_parent = XPath('element').parent()
+            self.assertEqual(single_segment_parent, XPath(''))
+            self.assertFalse(single_segment_parent.is_attribute())
 
     def test_split(self):
         absolute_attribute_xpath = XPath('/ns:root/nss:element/@nss:attribute')
@@ -375,7 +408,7 @@ class TestXMLNodeManipulations(unittest.TestCase):
                              )
 
 
-sample_no_namespace = """<?xml version="1.0"?>
+sample_no_namespace = b"""<?xml version="1.0"?>
 <catalog>
    <book id="bk101">
       <author>Gambardella, Matthew</author>
@@ -400,7 +433,7 @@ sample_no_namespace = """<?xml version="1.0"?>
 """
 
 
-sample_namespaced = """<?xml version="1.0"?>
+sample_namespaced = b"""<?xml version="1.0"?>
 <message:AIXMBasicMessage xmlns:message="http://www.aixm.aero/schema/5.1.1/message"
 	xmlns:gts="http://www.isotc211.org/2005/gts" xmlns:gco="http://www.isotc211.org/2005/gco"
 	xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:gml="http://www.opengis.net/gml/3.2"
@@ -418,11 +451,41 @@ sample_namespaced = """<?xml version="1.0"?>
 </message:AIXMBasicMessage>
 """
 
+sample_mixed_namespaces = b"""<?xml version="1.0"?>
+<root xmlns:ns="urn:ns" xmlns:at="urn:at">
+   <item id="1"/>
+   <!-- a comment between siblings -->
+   <ns:item/>
+   <item at:id="2"/>
+   <?instruction between siblings?>
+   <ns:item>
+      <ns:value>a</ns:value>
+      <value>b</value>
+   </ns:item>
+   <group xmlns="urn:default">
+      <item/>
+      <!-- a comment in the default namespace -->
+      <ns:item/>
+      <item id="3"/>
+      <other>
+         <value/>
+      </other>
+   </group>
+   <group/>
+</root>
+"""
+
+# The samples are parsed once with a shared parser, the tests below only read the trees
+parser = etree.XMLParser(collect_ids=False, remove_blank_text=True)
+tree_no_namespace = etree.ElementTree(etree.fromstring(sample_no_namespace, parser))
+tree_namespaced = etree.ElementTree(etree.fromstring(sample_namespaced, parser))
+tree_mixed_namespaces = etree.ElementTree(etree.fromstring(sample_mixed_namespaces, parser))
+
+
 class TestFindNamespaces(unittest.TestCase):
 
     def test_exist_namespaces(self):
-        root = etree.fromstring(sample_namespaced)
-        xml_tree = etree.ElementTree(root)
+        xml_tree = tree_namespaced
         xml_namespaces = {'message': 'http://www.aixm.aero/schema/5.1.1/message', 'gts': 'http://www.isotc211.org/2005/gts',
                           'gco': 'http://www.isotc211.org/2005/gco', 'xsd': 'http://www.w3.org/2001/XMLSchema',
                           'gml': 'http://www.opengis.net/gml/3.2', 'gss': 'http://www.isotc211.org/2005/gss',
@@ -432,8 +495,7 @@ class TestFindNamespaces(unittest.TestCase):
         self.assertEqual(find_namespaces(xml_tree), xml_namespaces)
 
     def test_no_namespaces(self):
-        root = etree.fromstring(sample_no_namespace)
-        xml_tree = etree.ElementTree(root)
+        xml_tree = tree_no_namespace
         xml_namespaces = {}
         self.assertEqual(find_namespaces(xml_tree), xml_namespaces)
 
@@ -441,8 +503,7 @@ class TestFindNamespaces(unittest.TestCase):
 class TestXPathGeneration(unittest.TestCase):
 
     def test_node_xpaths(self):
-        root = etree.fromstring(sample_no_namespace)
-        xml_tree = etree.ElementTree(root)
+        xml_tree = tree_no_namespace
         xpath_set = {XPath('/catalog/book[1]'),
                      XPath('/catalog/book[1]/@id'), XPath('/catalog/book[1]/author'), XPath('/catalog/book[1]/title'), XPath('/catalog/book[1]/genre'),
                      XPath('/catalog/book[1]/price'), XPath('/catalog/book[1]/publish_date'), XPath('/catalog/book[1]/description'),
@@ -454,6 +515,18 @@ class TestXPathGeneration(unittest.TestCase):
         with self.subTest():
             self.assertSetEqual(xpath_set, set(generate_node_xpaths(xml_tree)))
 
+    def test_node_xpaths_match_getpath(self):
+        xml_tree = tree_mixed_namespaces
+        xml_namespaces = {'ns': 'urn:ns', 'at': 'urn:at'}
+        expected = []
+        for element in xml_tree.getroot().iterdescendants(etree.Element):
+            element_path = xml_tree.getpath(element)
+            expected.append(XPath(element_path))
+            for attrib_name in element.attrib.keys():
+                attrib_name = attrib_name.replace('{urn:at}', 'at:')
+                expected.append(XPath(f'{element_path}/@{attrib_name}'))
+        self.assertEqual(list(generate_node_xpaths(xml_tree, xml_namespaces)), expected)
+
 
 
 if __name__ == '__main__':